@@ -22,28 +22,44 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import base36
+import heapq
 import math
 
 from . import __version__
 from .schemas import Score, BarLength
 
+from bisect import bisect_right
 from collections import defaultdict
+from io import StringIO
 from typing import Optional, TextIO, Union
 from dataclasses import fields
 
+# レーン・幅・チャンネル(1桁)とBPM識別子(2桁)のbase36表記
+# 添字は0..35(1桁)、0..36^2-1(2桁)であること。負の値は範囲チェックされず末尾から数えた文字になる
+_B36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+_B36_2 = tuple(high + low for high in _B36 for low in _B36)
+
 class ChannelProvider:
-    channel_map: dict[int, tuple[int, int]]
+    free_channels: list[int]
+    used_channels: list[tuple[int, int]]
     
     def __init__(self):
-        self.channel_map = { key: (0, 0) for key in range(36) }
+        self.free_channels = list(range(36))
+        self.used_channels = []
     
     def generate_channel(self, start_tick: int, end_tick: int) -> int:
-        for key, (start, end) in self.channel_map.items():
-            if (start == 0 and end == 0) or end_tick < start or end < start_tick:
-                self.channel_map[key] = (start_tick, end_tick)
-                return key
-        raise Exception('No more channel available.')
+        """
+        Allocate the lowest channel that is free at start_tick.
+
+        Calls must be made in ascending order of start_tick.
+        """
+        while self.used_channels and self.used_channels[0][0] < start_tick:
+            heapq.heappush(self.free_channels, heapq.heappop(self.used_channels)[1])
+        if not self.free_channels:
+            raise Exception('No more channel available.')
+        key = heapq.heappop(self.free_channels)
+        heapq.heappush(self.used_channels, (end_tick, key))
+        return key
 
 def dump(score: Score, fp: TextIO, **kw) -> None:
     """
@@ -78,10 +94,11 @@ def dumps(
     :param space: Whether to add a space after the tag (with space: "#00010: 00", without: "#00010:00").
     :return: SUS data as a string.
     """
-    lines = []
+    buf = StringIO()
+    separator = ' ' if space else ''
     
     # Metadata
-    lines.append(comment)
+    buf.write(f'{comment}\n')
     
     ticks_per_beat = 480
     for field in fields(score.metadata):
@@ -89,17 +106,17 @@ def dumps(
         if attr is None:
             continue
         if field.name != 'requests':
-            lines.append(f'#{field.name.upper()} {format_value(attr, field.type is Optional[str])}')
+            buf.write(f'#{field.name.upper()} {format_value(attr, field.type is Optional[str])}\n')
         else:
-            lines.append('')
+            buf.write('\n')
             for request in score.metadata.requests:
-                lines.append(f'#REQUEST "{request}"')
+                buf.write(f'#REQUEST "{request}"\n')
                 if request.startswith('ticks_per_beat'):
                     ticks_per_beat = int(request.split()[1])
-    lines.append('')
+    buf.write('\n')
     
     # Scoredata
-    note_maps = defaultdict(lambda: { 'raws': [], 'ticks_per_measure': 0 })
+    note_maps = defaultdict(lambda: { 'ticks': [], 'datas': [], 'gcd': 0, 'ticks_per_measure': 0 })
     
     bar_lengths = sorted(score.bar_lengths, key=lambda x: x[0])
     bpms = sorted(score.bpms, key=lambda x: x[0])
@@ -110,8 +127,8 @@ def dumps(
     tils = sorted(score.tils, key=lambda x: x[0])
 
     for measure, value in bar_lengths:
-        lines.append(f'#{measure:03}02:{" " if space else ""}{format_number(value)}')
-    lines.append('')
+        buf.write(f'#{measure:03}02:{separator}{format_number(value)}\n')
+    buf.write('\n')
 
     accumulated_ticks = 0
     
@@ -123,43 +140,45 @@ def dumps(
         accumulated_ticks += int((nextMeasure - measure) * value * ticks_per_beat)
         bar_lengths_in_ticks.append(BarLength(start_tick, measure, value))
     
-    bar_lengths_in_ticks.reverse()
+    bar_start_ticks = [bar_length.start_tick for bar_length in bar_lengths_in_ticks]
+    bar_ticks_per_measure = [int(bar_length.value * ticks_per_beat) for bar_length in bar_lengths_in_ticks]
     
     def push_raw(tick: int, info: str, data: str):
-        for bar_length in bar_lengths_in_ticks:
-            if tick >= bar_length.start_tick:
-                current_measure = bar_length.measure + int((tick - bar_length.start_tick) / ticks_per_beat / bar_length.value)
-                note_map = note_maps[f'{current_measure:03}{info}']
-                note_map['raws'].append([tick - bar_length.start_tick, data])
-                note_map['ticks_per_measure'] = int(bar_length.value * ticks_per_beat)
-                break
+        index = bisect_right(bar_start_ticks, tick) - 1
+        if index < 0:
+            return
+        bar_length = bar_lengths_in_ticks[index]
+        ticks_per_measure = bar_ticks_per_measure[index]
+        measure_offset, relative_tick = divmod(tick - bar_length.start_tick, ticks_per_measure)
+        note_map = note_maps[f'{bar_length.measure + measure_offset:03}{info}']
+        note_map['ticks'].append(relative_tick)
+        note_map['datas'].append(data)
+        note_map['gcd'] = math.gcd(note_map['gcd'], relative_tick)
+        note_map['ticks_per_measure'] = ticks_per_measure
     
     if len(bpms) >= 36 ** 2 - 1:
-        raise Exception(f'Too much BPMS ({bpms.length} >= 36^2 -1 = {36 ** 2 - 1})')
+        raise Exception(f'Too much BPMS ({len(bpms)} >= 36^2 -1 = {36 ** 2 - 1})')
 
     bpm_identifiers = {}
     for tick, value in bpms:
-        identifier = base36.dumps(len(bpm_identifiers) + 1).zfill(2)
         if value not in bpm_identifiers:
+            identifier = _B36_2[len(bpm_identifiers) + 1]
             bpm_identifiers[value] = identifier
-            lines.append(f'#BPM{bpm_identifiers[value]}:{" " if space else ""}{format_number(value)}')
+            buf.write(f'#BPM{identifier}:{separator}{format_number(value)}\n')
         push_raw(tick, '08', bpm_identifiers[value])
-    lines.append('')
+    buf.write('\n')
 
     # ハイスピ(dumper側は変拍子対応が不要のため未対応)
-    til_list = []
-    for tick, value in tils:
-        til_list.append(f"{tick//(ticks_per_beat*4)}'{tick%(ticks_per_beat*4)}:{value}")
-    lines.append('#TIL00: "' + f"{', '.join(til_list)}" + '"')
-    lines.append('#HISPEED 00')
-    lines.append('#MEASUREHS 00')
-    lines.append('')
+    ticks_per_bar = ticks_per_beat * 4
+    til_text = ', '.join(f"{tick // ticks_per_bar}'{tick % ticks_per_bar}:{value}" for tick, value in tils)
+    buf.write(f'#TIL00: "{til_text}"\n#HISPEED 00\n#MEASUREHS 00\n')
+    buf.write('\n')
 
     for note in taps:
-        push_raw(note.tick, f'1{base36.dumps(note.lane)}', f'{note.type}{base36.dumps(note.width)}')
+        push_raw(note.tick, '1' + _B36[note.lane], str(note.type) + _B36[note.width])
 
     for note in directionals:
-        push_raw(note.tick, f'5{base36.dumps(note.lane)}', f'{note.type}{base36.dumps(note.width)}')
+        push_raw(note.tick, '5' + _B36[note.lane], str(note.type) + _B36[note.width])
 
     slide_provider = ChannelProvider()
     for steps in slides:
@@ -167,7 +186,7 @@ def dumps(
         end_tick = steps[-1].tick
         channel = slide_provider.generate_channel(start_tick, end_tick)
         for note in steps:
-            push_raw(note.tick, f'3{base36.dumps(note.lane)}{base36.dumps(channel)}', f'{note.type}{base36.dumps(note.width)}')
+            push_raw(note.tick, '3' + _B36[note.lane] + _B36[channel], str(note.type) + _B36[note.width])
 
     # ガイドノーツに対応
     guide_provider = ChannelProvider()
@@ -176,20 +195,17 @@ def dumps(
         end_tick = steps[-1].tick
         channel = guide_provider.generate_channel(start_tick, end_tick)
         for note in steps:
-            push_raw(note.tick, f'9{base36.dumps(note.lane)}{base36.dumps(channel)}', f'{note.type}{base36.dumps(note.width)}')
+            push_raw(note.tick, '9' + _B36[note.lane] + _B36[channel], str(note.type) + _B36[note.width])
     
+    write = buf.write
     for tag, note_map in note_maps.items():
-        gcd = note_map['ticks_per_measure']
-        for raw in note_map['raws']:
-            gcd = math.gcd(raw[0], gcd)
-        data = {}
-        for raw in note_map['raws']:
-            data[(raw[0] % note_map['ticks_per_measure'])] = raw[1]
-        values = []
-        for i in range(0, note_map['ticks_per_measure'], gcd):
-            values.append(data.get(i) or '00')
-        lines.append(f'#{tag}:{" " if space else ""}{"".join(values)}')
-
-    lines.append('')
-
-    return '\n'.join(lines)
+        ticks_per_measure = note_map['ticks_per_measure']
+        gcd = math.gcd(ticks_per_measure, note_map['gcd'])
+        values = ['00'] * (ticks_per_measure // gcd)
+        for tick, value in zip(note_map['ticks'], note_map['datas']):
+            values[tick // gcd] = value
+        write(f'#{tag}:{separator}')
+        write(''.join(values))
+        write('\n')
+
+    return buf.getvalue()
@@ -53,7 +53,7 @@ class Metadata:
     requests: Optional[list[str]] = exclude_none()
 
 @dataclass_json(letter_case=LetterCase.CAMEL)
-@dataclass
+@dataclass(slots=True)
 class Note:
     tick: int
     lane: int
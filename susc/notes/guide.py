@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Literal
+from .sortkey import BEAT_KEY
 
 
 @dataclass
@@ -20,7 +21,7 @@ class Guide:
 
     def append(self, guidepoint: GuidePoint):
         self.midpoints.append(guidepoint)
-        self.midpoints.sort(key= lambda x: x.beat)
+        self.midpoints.sort(key=BEAT_KEY)
 
     def get_sort_number(self) -> int:
         return 5
\ No newline at end of file
@@ -5,6 +5,7 @@ from .timescale import TimeScaleGroup
 from .single import Single
 from .slide import Slide, SlideStartPoint, SlideRelayPoint, SlideEndPoint
 from .guide import Guide, GuidePoint
+from .sortkey import BEAT_KEY
 
 
 # 1tickをbeatに変換
@@ -198,7 +199,7 @@ def _shift_guide(
         while _get_overlap_note(point, split_tmp_notes) != None:
             point.beat += BEAT_PER_TICK
     
-    note.midpoints.sort(key=lambda x:x.beat)
+    note.midpoints.sort(key=BEAT_KEY)
 
 
 def _shift_single(
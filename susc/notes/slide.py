@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Literal
+from .sortkey import BEAT_KEY
 
 
 @dataclass
@@ -45,7 +46,7 @@ class Slide:
 
     def append(self, slidepoint: SlideStartPoint | SlideRelayPoint | SlideEndPoint):
         self.connections.append(slidepoint)
-        self.connections.sort(key= lambda x: x.beat)
+        self.connections.sort(key=BEAT_KEY)
 
     def get_sort_number(self) -> int:
         return 4
\ No newline at end of file
@@ -0,0 +1,5 @@
+from operator import attrgetter
+
+
+# ノーツ・中継点をbeat順に並べるためのキー
+BEAT_KEY = attrgetter("beat")
\ No newline at end of file
@@ -1,5 +1,5 @@
 import custom_sus_io as csus
-from typing import cast
+from typing import Callable, cast
 from susc import __version__
 from ..notes.score import Score
 from ..notes.bpm import Bpm
@@ -10,193 +10,201 @@ from ..notes.guide import Guide, GuidePoint
 from .notetype import SusNoteType
 
 
-# beatをtickに変換する
-def beat_to_tick(beat: float) -> int:
-    return round(480 * beat)
-
-# uscのレーン記法からsusのレーン記法に変換する
-def usc_lanes_to_sus_lanes(lane: float, size: float) -> int:
-    return int(lane - size + 8)
-
-# uscのノーツサイズ記法からsusのノーツサイズ記法に変換する
-def usc_notesize_to_sus_notesize(size: float) -> int:
-    #if size % 0.5 != 0:
-    #    Exception("小数幅が検出されました")
-    return int(size * 2)
+# uscのbeat・レーン・ノーツサイズ記法からsusのtick・レーン・幅への変換は各ハンドラ内で直接計算する
+# tick = round(480 * beat), lane = int(lane - size + 8), width = int(size * 2)
+
+_Note = csus.Note
+
+# ノーツの種類(属性参照を減らすためモジュール変数に展開)
+_T_TAP = SusNoteType.Tap.TAP
+_T_CTAP = SusNoteType.Tap.C_TAP
+_T_FLICK = SusNoteType.Tap.FLICK
+_T_TRACE = SusNoteType.Tap.TRACE
+_T_CTRACE = SusNoteType.Tap.C_TRACE
+_T_ELASER = SusNoteType.Tap.ELASER
+_T_CELASER = SusNoteType.Tap.C_ELASER
+
+_S_START = SusNoteType.Slide.START
+_S_END = SusNoteType.Slide.END
+_S_STEP = SusNoteType.Slide.STEP
+_S_VSTEP = SusNoteType.Slide.VISIBLE_STEP
+
+_G_START = SusNoteType.Guide.START
+_G_END = SusNoteType.Guide.END
+_G_STEP = SusNoteType.Guide.STEP
+
+# フリックの向き -> 矢印ノーツの種類
+_DIRECTION_TO_AIR: dict[str, int] = {
+    "up": SusNoteType.Air.UP,
+    "left": SusNoteType.Air.LEFT_UP,
+    "right": SusNoteType.Air.RIGHT_UP,
+}
+
+# 曲線の種類 -> 矢印ノーツの種類(直線は無し)
+_EASE_TO_AIR: dict[str, int] = {
+    "in": SusNoteType.Air.DOWN,
+    "out": SusNoteType.Air.RIGHT_DOWN,
+}
+
+# ガイドの色 -> タップノーツの種類
+_COLOR_TO_TAP: dict[str, int] = {
+    "yellow": SusNoteType.Tap.C_ELASER,
+    "green": SusNoteType.Tap.ELASER,
+}
+
+# 始点・終点の判定の種類とクリティカルか -> タップノーツの種類(通常判定の非クリティカルは無し)
+_JUDGE_TYPE_TO_TAP: dict[tuple[str, bool], int] = {
+    ("none", False): SusNoteType.Tap.ELASER,
+    ("none", True): SusNoteType.Tap.C_ELASER,
+    ("trace", False): SusNoteType.Tap.TRACE,
+    ("trace", True): SusNoteType.Tap.C_TRACE,
+    ("normal", True): SusNoteType.Tap.C_TAP,
+}
+
+def _export_bpm(note: Bpm, taps: list, directionals: list, slides: list, guides: list, bpms: list, tils: list):
+    tick = round(480 * note.beat)
+    bpms.append((tick, note.bpm))
+
+def _export_timescale_group(note: TimeScaleGroup, taps: list, directionals: list, slides: list, guides: list, bpms: list, tils: list):
+    for changepoint in note.changes:
+        changepoint = cast(TimeScalePoint, changepoint)
+        tick = round(480 * changepoint.beat)
+        tils.append((tick, changepoint.timeScale))
+
+def _export_single(note: Single, taps: list, directionals: list, slides: list, guides: list, bpms: list, tils: list):
+    tick = round(480 * note.beat)
+    lane = int(note.lane - note.size + 8)
+    width = int(note.size * 2)
+    if note.trace: # トレース or 金トレース
+        if note.critical:
+            taps.append( _Note(tick, lane, width, _T_CTRACE) )
+        else:
+            taps.append( _Note(tick, lane, width, _T_TRACE) )
+    else: # タップ or 金タップ
+        if note.critical:
+            taps.append( _Note(tick, lane, width, _T_CTAP) )
+        else:
+            taps.append( _Note(tick, lane, width, _T_TAP) )
+    if note.direction: # フリック付
+        air = _DIRECTION_TO_AIR.get(note.direction)
+        if air is not None:
+            directionals.append( _Note(tick, lane, width, air) )
+
+def _export_slide(note: Slide, taps: list, directionals: list, slides: list, guides: list, bpms: list, tils: list):
+    slide: list[csus.Note] = []
+    append_tap = taps.append
+    append_directional = directionals.append
+    append_step = slide.append
+    for step in note.connections:
+        tick = round(480 * step.beat)
+        lane = int(step.lane - step.size + 8)
+        width = int(step.size * 2)
+        # 始点
+        if step.type == "start": 
+            step = cast(SlideStartPoint, step)
+            air = _EASE_TO_AIR.get(step.ease)
+            if air is not None: # 加速 or 減速
+                append_directional( _Note(tick, lane, width, air) )
+            tap_type = _JUDGE_TYPE_TO_TAP.get((step.judgeType, bool(step.critical)))
+            if tap_type is not None: # 始点消し or 始点トレース or 金始点
+                append_tap( _Note(tick, lane, width, tap_type) )
+            append_step( _Note(tick, lane, width, _S_START) )
+
+        # 中継点
+        elif step.type in ("tick", "attach"):
+            step = cast(SlideRelayPoint, step)
+            air = _EASE_TO_AIR.get(step.ease)
+            if air is not None: # 加速 or 減速
+                append_tap( _Note(tick, lane, width, _T_TAP) )
+                append_directional( _Note(tick, lane, width, air) )
+            if step.type == "tick":  
+                if step.critical == None: # 不可視中継点 
+                    append_step( _Note(tick, lane, width, _S_STEP) )
+                else: # 可視中継点
+                    append_step( _Note(tick, lane, width, _S_VSTEP) )
+            elif step.type == "attach": # 無視中継点
+                append_tap( _Note(tick, lane, width, _T_FLICK))
+                append_step( _Note(tick, lane, width, _S_VSTEP) )
+
+        # 終点
+        elif step.type == "end":
+            step = cast(SlideEndPoint, step)
+            # 通常判定の終点はフリック付のときのみ金タップを置く
+            if step.judgeType != "normal" or step.direction:
+                tap_type = _JUDGE_TYPE_TO_TAP.get((step.judgeType, bool(step.critical)))
+                if tap_type is not None: # 終点消し or 終点トレース or 金終点
+                    append_tap( _Note(tick, lane, width, tap_type) )
+            if step.direction: # フリック付
+                air = _DIRECTION_TO_AIR.get(step.direction)
+                if air is not None:
+                    append_directional( _Note(tick, lane, width, air) )
+            append_step( _Note(tick, lane, width, _S_END) )
+    slides.append(slide)
+
+def _export_guide(note: Guide, taps: list, directionals: list, slides: list, guides: list, bpms: list, tils: list):
+    guide: list[csus.Note] = []
+    append_tap = taps.append
+    append_directional = directionals.append
+    append_step = guide.append
+    point_length = len(note.midpoints)
+    for idx, step in enumerate(note.midpoints):
+        step = cast(GuidePoint, step)
+        tick = round(480 * step.beat)
+        lane = int(step.lane - step.size + 8)
+        width = int(step.size * 2)
+        # 始点
+        if idx == 0:
+            tap_type = _COLOR_TO_TAP.get(note.color)
+            if tap_type is not None:
+                append_tap( _Note(tick, lane, width, tap_type) )
+
+            air = _EASE_TO_AIR.get(step.ease)
+            if air is not None: # 加速 or 減速
+                append_directional( _Note(tick, lane, width, air) )
+            append_step( _Note(tick, lane, width, _G_START) )
+
+        # 終点
+        elif idx == point_length-1:
+            if note.color == "yellow":
+                append_tap( _Note(tick, lane, width, _T_CELASER) )
+            append_step( _Note(tick, lane, width, _G_END) )
+
+        # 中継点
+        else:
+            air = _EASE_TO_AIR.get(step.ease)
+            if air is not None: # 加速 or 減速
+                tap_type = _COLOR_TO_TAP.get(note.color)
+                if tap_type is not None:
+                    append_tap( _Note(tick, lane, width, tap_type) )
+                append_directional( _Note(tick, lane, width, air) )
+            elif step.ease == "linear": # 直線
+                if note.color == "yellow":
+                    append_tap( _Note(tick, lane, width, _T_CELASER) )
+            append_step( _Note(tick, lane, width, _G_STEP) )
+    guides.append(guide)
+
+_EXPORT_HANDLERS: dict[type, Callable[..., None]] = {
+    Bpm: _export_bpm,
+    TimeScaleGroup: _export_timescale_group,
+    Single: _export_single,
+    Slide: _export_slide,
+    Guide: _export_guide,
+}
 
 def export(path: str, score: Score):
     metadata = score.metadata
     notes = score.notes
-    taps = []
-    directionals = []
-    slides = []
-    guides = []
-    bpms = []
-    tils = []
+    taps: list[csus.Note] = []
+    directionals: list[csus.Note] = []
+    slides: list[list[csus.Note]] = []
+    guides: list[list[csus.Note]] = []
+    bpms: list[tuple[int, float]] = []
+    tils: list[tuple[int, float]] = []
 
     for note in notes:
-        if isinstance(note, Bpm):
-            tick = beat_to_tick(note.beat)
-            bpms.append((tick, note.bpm))
-
-        elif isinstance(note, TimeScaleGroup):
-            note = cast(TimeScaleGroup, note)
-            for changepoint in note.changes:
-                changepoint = cast(TimeScalePoint, changepoint)
-                tick = beat_to_tick(changepoint.beat)
-                tils.append((tick, changepoint.timeScale))
-
-        elif isinstance(note, Single):
-            lane = usc_lanes_to_sus_lanes(note.lane, note.size)
-            width = usc_notesize_to_sus_notesize(note.size)
-            tick = beat_to_tick(note.beat)
-            if note.trace: # トレース or 金トレース
-                if note.critical:
-                    taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TRACE) )
-                else:
-                    taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TRACE) )
-            else: # タップ or 金タップ
-                if note.critical:
-                    taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TAP) )
-                else:
-                    taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TAP) )
-            if note.direction: # フリック付
-                if note.direction == "up":
-                    directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.UP) )
-                elif note.direction == "left":
-                    directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.LEFT_UP) )
-                elif note.direction == "right":
-                    directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_UP) )
-
-        elif isinstance(note, Slide):
-            slide = []
-            for step in note.connections:
-                tick = beat_to_tick(step.beat)
-                lane = usc_lanes_to_sus_lanes(step.lane, step.size)
-                width = usc_notesize_to_sus_notesize(step.size)
-                # 始点
-                if step.type == "start": 
-                    step = cast(SlideStartPoint, step)
-                    if step.ease == "in": # 加速
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.DOWN) )
-                    elif step.ease == "out": # 減速
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_DOWN) )
-                    elif step.ease == "linear": # 直線
-                        pass
-                    if step.judgeType == "none": # 始点消し
-                        if step.critical:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                        else:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.ELASER) )
-                    elif step.judgeType == "trace": # 始点トレース
-                        if step.critical:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TRACE) )
-                        else:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TRACE) )
-                    elif step.judgeType == "normal":
-                        if step.critical:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TAP) )
-                    slide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Slide.START) )
-
-                # 中継点
-                elif step.type in ("tick", "attach"):
-                    step = cast(SlideRelayPoint, step)
-                    if step.ease == "in": # 加速
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TAP) )
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.DOWN) )
-                    elif step.ease == "out": # 減速
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TAP) )
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_DOWN) )
-                    elif step.ease == "linear": # 直線
-                        pass
-                    if step.type == "tick":  
-                        if step.critical == None: # 不可視中継点 
-                            slide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Slide.STEP) )
-                        else: # 可視中継点
-                            slide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Slide.VISIBLE_STEP) )
-                    elif step.type == "attach": # 無視中継点
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.FLICK))
-                        slide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Slide.VISIBLE_STEP) )
-
-                # 終点
-                elif step.type == "end":
-                    step = cast(SlideEndPoint, step)
-                    if step.judgeType == "none": # 終点消し
-                        if step.critical:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                        else:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.ELASER) )
-                    elif step.judgeType == "trace": # 終点トレース
-                        if step.critical:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TRACE) )
-                        else:
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.TRACE) )
-                    elif step.judgeType == "normal":
-                        if step.direction:
-                            if step.critical:
-                                taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_TAP) )
-                    if step.direction: # フリック付
-                        if step.direction == "up":
-                            directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.UP) )
-                        elif step.direction == "left":
-                            directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.LEFT_UP) )
-                        elif step.direction == "right":
-                            directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_UP) )
-                    slide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Slide.END) )
-            slides.append(slide)
-
-        elif isinstance(note, Guide):
-            guide = []
-            point_length = len(note.midpoints)
-            for idx, step in enumerate(note.midpoints):
-                step = cast(GuidePoint, step)
-                tick = beat_to_tick(step.beat)
-                lane = usc_lanes_to_sus_lanes(step.lane, step.size)
-                width = usc_notesize_to_sus_notesize(step.size)
-                # 始点
-                if idx == 0:
-                    if note.color == "yellow":
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                    elif note.color == "green":
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.ELASER) )
-
-                    if step.ease == "in": # 加速
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.DOWN) )
-                    elif step.ease == "out": # 減速
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_DOWN) )
-                    elif step.ease == "linear": # 直線
-                        pass
-                    guide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Guide.START) )
-
-                # 終点
-                elif idx == point_length-1:
-                    if note.color == "yellow":
-                        taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                    elif note.color == "green":
-                        pass
-                    guide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Guide.END) )
-
-                # 中継点
-                else:
-                    if step.ease == "in": # 加速
-                        if note.color == "yellow":
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                        elif note.color == "green":
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.ELASER) )
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.DOWN) )
-                    elif step.ease == "out": # 減速
-                        if note.color == "yellow":
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                        elif note.color == "green":
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.ELASER) )
-                        directionals.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Air.RIGHT_DOWN) )
-                    elif step.ease == "linear": # 直線
-                        if note.color == "yellow":
-                            taps.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Tap.C_ELASER) )
-                        elif note.color == "green":
-                            pass
-                    guide.append( csus.Note(tick=tick, lane=lane, width=width, type=SusNoteType.Guide.STEP) )
-            guides.append(guide)
+        handler = _EXPORT_HANDLERS.get(type(note))
+        if handler is not None:
+            handler(note, taps, directionals, slides, guides, bpms, tils)
 
     sus_metadata = csus.Metadata(
         title=metadata.title,
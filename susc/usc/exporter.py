@@ -29,4 +29,4 @@ def export(path: str, score: Score):
     }
     
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(usc_data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+        f.write(json.dumps(usc_data, indent=4, ensure_ascii=False))
\ No newline at end of file